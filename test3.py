@@ -1,266 +1,610 @@
+import argparse
+import asyncio
+import functools
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+import hashlib
+import logging
 import os
 import re
-from crewai import Agent, Task, Crew, Process
-from crewai.tools import tool
+import sqlite3
+import threading
 from dotenv import load_dotenv
-from crewai.llm import LLM
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; svg_modifier_tool falls back to text edits
+    etree = None
 
 # --- Configuration & Environment ---
 
 load_dotenv()
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("❌ OPENAI_API_KEY not set in .env")
-
-# Initialize LLM for CrewAI 0.165.1
-llm = LLM(model="gpt-4o-mini", api_key=api_key)
+log = logging.getLogger("svg_gen")
 
 INPUT_SVG_PATH = "input.svg"
 OUTPUT_SVG_PATH = "output.svg"
-
-# Global storage for passing data between tasks
-workflow_data = {}
+SEMANTIC_CACHE_PATH = "semantic_cache.sqlite3"
+
+# CrewAI, the LLM client, OpenAI and numpy are only imported by _build_crew/SemanticCache,
+# so these can be used without them installed or OPENAI_API_KEY set
+__all__ = [
+    "GradientConfig",
+    "read_svg_file",
+    "write_svg_file",
+    "parse_gradient_details_tool",
+    "svg_modifier_tool",
+    "process_svg",
+    "run_batch",
+    "main",
+]
+
+# Storage for passing data between tasks; a ContextVar so concurrent runs don't share it
+_WF: ContextVar[dict] = ContextVar("workflow_data")
+
+# Passed by the modifier agent instead of the SVG itself; the tool reads the stored svg_text
+CACHED_SVG_SENTINEL = "__USE_CACHED__"
+
+# Precompiled patterns
+_HEX_RE = re.compile(r"#([0-9a-fA-F]{6})")
+_SHAPES = ("rect", "circle", "ellipse")
+# Whole words only, so "rect" doesn't match inside "direction" or "correct"
+_SHAPE_RE = re.compile(r"\b(rect(?:angle)?|circle|ellipse)s?\b")
+_FILL_RES = {s: re.compile(rf'(<{s}[^>]*\s)fill="[^"]*"([^>]*>)') for s in _SHAPES}
+_NO_FILL_RES = {s: re.compile(rf'(<{s}[^>]*?)(/?>)') for s in _SHAPES}
+# A previous <linearGradient>/<radialGradient> element with a given id, with its indentation
+_OLD_GRAD_RE = r'[ \t]*<(linear|radial)Gradient\b[^>]*\bid="{}"[^>]*?(?:/>|>.*?</\1Gradient>)\n?'
+
+# Gradient attributes by (type, direction); radial gradients ignore direction
+_DIR_ATTRS = {
+    ("linear", "vertical"): 'x1="0%" y1="0%" x2="0%" y2="100%"',
+    ("linear", "horizontal"): 'x1="0%" y1="0%" x2="100%" y2="0%"',
+    ("radial", None): 'cx="50%" cy="50%" r="50%"',
+}
+
+
+@dataclass(slots=True, frozen=True)
+class GradientConfig:
+    """Gradient settings parsed from the user prompt."""
+
+    type: str = "linear"
+    direction: str = "vertical"
+    start_color: str = "#ff0000"
+    end_color: str = "#0000ff"
+    target_shape: str = "rect"
 
 
 # --- Utility Functions ---
 
 def read_svg_file(file_path):
+    # SVG is UTF-8; decode it ourselves rather than with the locale's codec
     try:
-        with open(file_path, "r") as f:
-            return f.read()
+        with open(file_path, "rb") as f:
+            return f.read().decode("utf-8")
     except FileNotFoundError:
-        print(f"Error: {file_path} not found.")
+        log.error("Error: %s not found.", file_path)
+        return None
+    except UnicodeDecodeError as e:
+        log.error("Error: %s is not valid UTF-8 (%s).", file_path, e)
         return None
 
 
 def write_svg_file(file_path, content):
-    with open(file_path, "w") as f:
-        f.write(content)
-    print(f"✅ Successfully wrote {file_path}")
+    # SVG is UTF-8; skip the locale codec and newline translation of text mode
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    with open(file_path, "wb") as f:
+        f.write(data)
+    log.info("✅ Successfully wrote %s", file_path)
 
 
-# --- Tools ---
+def _parse_svg(svg_content):
+    """Parse SVG text or bytes into an lxml root element; returns None if lxml can't be used."""
+    if etree is None:
+        return None
+    if isinstance(svg_content, str):
+        svg_content = svg_content.encode("utf-8")
+    try:
+        return etree.fromstring(svg_content)
+    except etree.XMLSyntaxError:
+        return None
 
-@tool
-def parse_gradient_details_tool(prompt: str) -> str:
-    """Parse user prompt for gradient details and store in global workflow_data."""
-    
-    gradient_config = {
-        "type": "linear",
-        "direction": "vertical",
-        "start_color": "#ff0000",
-        "end_color": "#0000ff",
-        "target_shape": "rect",
-    }
+
+def _apply_gradient_tree(root, defs_xml, grad_id, target_shape, xml_declaration=False):
+    """Insert gradient into the parsed SVG in place, update fills and serialize it."""
+    # Build the gradient <defs> in the document's namespace
+    ns = etree.QName(root).namespace
+    prefix = f"{{{ns}}}" if ns else ""
+    xmlns = f' xmlns="{ns}"' if ns else ""
+    new_defs = etree.fromstring(defs_xml.strip().replace("<defs>", f"<defs{xmlns}>", 1))
+
+    # Add to existing <defs> (replacing a previous gradient with the same id) or create one
+    defs = root.find(f"{prefix}defs")
+    if defs is None:
+        new_defs.tail = root.text
+        root.insert(0, new_defs)
+    else:
+        for old in defs.findall(f"*[@id='{grad_id}']"):
+            defs.remove(old)
+        defs.extend(new_defs)
+
+    for shape in root.iter(f"{prefix}{target_shape}"):
+        shape.set("fill", f"url(#{grad_id})")
+
+    # Serialize the whole document so a DOCTYPE and top-level comments/PIs survive;
+    # output is written as UTF-8, so a kept <?xml ...?> declaration says so
+    data = etree.tostring(root.getroottree(), encoding="utf-8", xml_declaration=xml_declaration)
+    return data.decode("utf-8")
+
+
+@functools.lru_cache(maxsize=128)
+def _gradient_xml(config, grad_id):
+    """Build the gradient element; memoized since configs come from a small set."""
+    direction = None if config.type == "radial" else config.direction
+    direction_attrs = _DIR_ATTRS.get((config.type, direction), _DIR_ATTRS[("linear", "vertical")])
+
+    return f"""        <{config.type}Gradient id="{grad_id}" {direction_attrs}>
+            <stop offset="0%" style="stop-color:{config.start_color}; stop-opacity:1" />
+            <stop offset="100%" style="stop-color:{config.end_color}; stop-opacity:1" />
+        </{config.type}Gradient>"""
+
+
+@functools.lru_cache(maxsize=256)
+def _apply_gradient(svg_content, config):
+    """Return svg_content with the gradient applied; memoized on (svg, config)."""
+    if "<svg" not in svg_content:
+        raise ValueError("SVG content has no <svg> element")
+
+    grad_id = "grad1"
+    gradient_xml = _gradient_xml(config, grad_id)
+    defs_xml = f"    <defs>\n{gradient_xml}\n    </defs>"
+
+    target_shape = config.target_shape
+
+    # Prefer a structural edit; fall back to text edits without lxml or on malformed SVG
+    root = _parse_svg(svg_content)
+    if root is not None:
+        has_decl = svg_content.lstrip().startswith("<?xml")
+        updated_svg = _apply_gradient_tree(root, defs_xml, grad_id, target_shape, has_decl)
+    else:
+        # Add the gradient to an existing <defs> block, keeping its other defs but
+        # replacing a previous gradient with the same id, as the lxml path does
+        start = svg_content.find("<defs>")
+        end = svg_content.find("</defs>", start)
+        if start != -1 and end != -1:
+            old_grad_re = re.compile(_OLD_GRAD_RE.format(re.escape(grad_id)), re.DOTALL)
+            block = old_grad_re.sub("", svg_content[start:end])
+            new_svg_content = svg_content[:start] + block + gradient_xml + "\n" + svg_content[end:]
+        else:
+            # Insert right after the opening <svg ...> tag
+            i = svg_content.index(">", svg_content.index("<svg")) + 1
+            new_svg_content = svg_content[:i] + "\n" + defs_xml + svg_content[i:]
+
+        # Replace fill attribute
+        updated_svg, count = _FILL_RES[target_shape].subn(rf'\1fill="url(#{grad_id})"\2', new_svg_content)
+        if count == 0:
+            # Add fill if not present
+            updated_svg = _NO_FILL_RES[target_shape].sub(rf'\1 fill="url(#{grad_id})"\2', new_svg_content)
+
+    return updated_svg
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_gradient_config(prompt):
+    """Extract the gradient config from a prompt; memoized so repeated prompts are free."""
+    changes = {}
+
+    lower_prompt = prompt.lower()
 
     # Extract colors from prompt
-    colors = re.findall(r"#([0-9a-fA-F]{6})", prompt)
+    colors = _HEX_RE.findall(prompt)
     if len(colors) >= 2:
-        gradient_config["start_color"] = f"#{colors[0]}"
-        gradient_config["end_color"] = f"#{colors[1]}"
+        changes["start_color"] = f"#{colors[0]}"
+        changes["end_color"] = f"#{colors[1]}"
 
     # Determine gradient type
-    if "radial" in prompt.lower():
-        gradient_config["type"] = "radial"
+    if "radial" in lower_prompt:
+        changes["type"] = "radial"
     
     # Determine direction
-    if "vertical" in prompt.lower():
-        gradient_config["direction"] = "vertical"
-    elif "horizontal" in prompt.lower():
-        gradient_config["direction"] = "horizontal"
-
-    # Extract target shape
-    if "rectangle" in prompt.lower() or "rect" in prompt.lower():
-        gradient_config["target_shape"] = "rect"
-    elif "circle" in prompt.lower():
-        gradient_config["target_shape"] = "circle"
-    elif "ellipse" in prompt.lower():
-        gradient_config["target_shape"] = "ellipse"
-
-    # Store in global workflow data
-    workflow_data['gradient_config'] = gradient_config
+    if "vertical" in lower_prompt:
+        changes["direction"] = "vertical"
+    elif "horizontal" in lower_prompt:
+        changes["direction"] = "horizontal"
+
+    # Extract target shape; rect wins over circle over ellipse when several are named
+    named_shapes = {word[:4] if word.startswith("rect") else word for word in _SHAPE_RE.findall(lower_prompt)}
+    for shape in _SHAPES:
+        if shape in named_shapes:
+            changes["target_shape"] = shape
+            break
+
+    return replace(GradientConfig(), **changes)
+
+
+def _skip_tool_cache(_args=None, _result=None):
+    """CrewAI cache hits skip the tool body, which would leave workflow_data stale."""
+    return False
+
+
+def _wf():
+    """Return the workflow data for the current context, creating it on first use."""
+    try:
+        return _WF.get()
+    except LookupError:
+        data = {}
+        _WF.set(data)
+        return data
+
+
+def _get_api_key():
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("❌ OPENAI_API_KEY not set in .env")
+    return api_key
+
+
+# --- Tools ---
+# Plain functions here; _build_crew wraps them with crewai's @tool
+
+def parse_gradient_details_tool(prompt: str) -> str:
+    """Parse user prompt for gradient details and store in workflow_data."""
+    
+    gradient_config = _parse_gradient_config(prompt)
+
+    # Store in workflow data
+    _wf()['gradient_config'] = gradient_config
     
     return f"Parsed gradient config: {gradient_config}"
 
 
-@tool
 def svg_modifier_tool(svg_content: str) -> str:
     """Insert gradient into SVG and update fill using stored config."""
     
-    config = workflow_data.get('gradient_config', {})
-    print(f"--- SVG MODIFIER AGENT ACTION ---")
-    print(f"Using config: {config}")
+    # Accept the sentinel with stray whitespace/quotes, and anything that isn't SVG
+    # markup, as a request for the stored input SVG
+    if svg_content.strip().strip("\"'") == CACHED_SVG_SENTINEL or "<svg" not in svg_content:
+        if 'svg_text' not in _wf():
+            raise ValueError("No input SVG loaded; pass SVG markup or run process_svg first")
+        svg_content = _wf()['svg_text']
 
-    gradient_type = config.get("type", "linear")
-    grad_id = "grad1"
+    config = _wf().get('gradient_config', GradientConfig())
+    log.debug("--- SVG MODIFIER AGENT ACTION ---")
+    log.debug("Using config: %s", config)
 
-    # Direction attributes
-    if gradient_type == "linear":
-        if config.get("direction") == "vertical":
-            direction_attrs = 'x1="0%" y1="0%" x2="0%" y2="100%"'
-        elif config.get("direction") == "horizontal":
-            direction_attrs = 'x1="0%" y1="0%" x2="100%" y2="0%"'
-        else:
-            direction_attrs = 'x1="0%" y1="0%" x2="0%" y2="100%"'
-    else:  # radial
-        direction_attrs = 'cx="50%" cy="50%" r="50%"'
-
-    # Create gradient definition
-    gradient_xml = f"""    <defs>
-        <{gradient_type}Gradient id="{grad_id}" {direction_attrs}>
-            <stop offset="0%" style="stop-color:{config['start_color']}; stop-opacity:1" />
-            <stop offset="100%" style="stop-color:{config['end_color']}; stop-opacity:1" />
-        </{gradient_type}Gradient>
-    </defs>"""
-
-    # Insert gradient definition
-    if "<defs>" in svg_content:
-        new_svg_content = re.sub(r"<defs>.*?</defs>", gradient_xml, svg_content, flags=re.DOTALL)
-    else:
-        new_svg_content = svg_content.replace("<svg", f"<svg").replace(">", f">\n{gradient_xml}", 1)
-
-    # Update the target shape's fill attribute
-    target_shape = config.get("target_shape", "rect")
-    
-    # Replace fill attribute
-    pattern = rf'(<{target_shape}[^>]*\s)fill="[^"]*"([^>]*>)'
-    if re.search(pattern, new_svg_content):
-        updated_svg = re.sub(pattern, rf'\1fill="url(#{grad_id})"\2', new_svg_content)
-    else:
-        # Add fill if not present
-        pattern_no_fill = rf'(<{target_shape}[^>]*?)(/?>)'
-        updated_svg = re.sub(pattern_no_fill, rf'\1 fill="url(#{grad_id})"\2', new_svg_content)
+    updated_svg = _apply_gradient(svg_content, config)
 
-    workflow_data['final_svg'] = updated_svg
+    _wf()['final_svg'] = updated_svg
     return updated_svg
 
 
-# --- Agents ---
-#Agent 1: this agent uses parse_gradient_details_tool for extracting gradient details from user prompts and pass it to the SVG modifier
-gradient_parser = Agent(
-    role="Gradient Parser",
-    goal="Extract gradient details from user prompt",
-    backstory="You are an expert at analyzing design prompts and extracting gradient specifications.",
-    llm=llm,
-    tools=[parse_gradient_details_tool],
-    verbose=True,
-    allow_delegation=False,
-)
-#Agent 2: this agent uses svg_modifier_tool for applying the gradient to the SVG and updating the fill attributes.
-svg_modifier = Agent(
-    role="SVG Modifier", 
-    goal="Apply gradient to SVG elements",
-    backstory="You are an SVG expert who specializes in adding gradients to SVG elements.",
-    llm=llm,
-    tools=[svg_modifier_tool],
-    verbose=True,
-    allow_delegation=False,
-)
-
-
-# --- Tasks ---
-# Task 1: Parse gradient details from user prompt 
-task_parse = Task(
-    description="""
-    Analyze this user prompt and extract gradient details: {user_prompt}
-    
-    Use the parse_gradient_details_tool to identify:
-    - Gradient type (linear or radial)
-    - Direction (horizontal or vertical) 
-    - Start and end colors
-    - Target shape to modify
-    
-    Return the parsed configuration.
-    """,
-    agent=gradient_parser,
-    expected_output="Gradient configuration details",
-)
-# Task 2: Modify SVG with gradient and gets updated SVG 
-task_modify = Task(
-    description="""
-    Modify the SVG to apply the gradient that was parsed in the previous task.
-    
-    Input SVG: {svg_content}
-    
-    Use the svg_modifier_tool to apply the gradient configuration to the SVG.
-    Return the complete modified SVG with the gradient applied.
-    """,
-    agent=svg_modifier,
-    expected_output="Complete SVG with gradient applied",
-    context=[task_parse],
-)
-
+def _fast_path(user_prompt):
+    """Apply the gradient without the crew when the prompt names two hex colors and a shape."""
+    lower_prompt = user_prompt.lower()
+    if len(_HEX_RE.findall(user_prompt)) < 2 or not _SHAPE_RE.search(lower_prompt):
+        return None
 
-# --- Crew ---
-# This crew is responsible for handling the gradient application workflow
-crew = Crew(
-    agents=[gradient_parser, svg_modifier],
-    tasks=[task_parse, task_modify],
-    process=Process.sequential,
-    verbose=True,
-)
+    parse_gradient_details_tool(user_prompt)
+    return svg_modifier_tool(CACHED_SVG_SENTINEL)
+
+
+def _build_crew(verbose=True):
+    """Create the LLM, agents, tasks and crew; imports CrewAI on first use."""
+    from crewai import Agent, Task, Crew, Process
+    from crewai.llm import LLM
+    from crewai.tools import tool
+
+    # Initialize LLM for CrewAI 0.165.1
+    # OpenAI caches identical prompt prefixes (>=1024 tokens) automatically, so agent
+    # and task prompts keep static text first and the {placeholders} last.
+    llm = LLM(model="gpt-4o-mini", api_key=_get_api_key())
+
+    # --- Tools ---
+    parse_tool = tool(parse_gradient_details_tool)
+    modifier_tool = tool(svg_modifier_tool)
+
+    # Both tools read or write workflow_data, so their results can't be keyed on the
+    # tool input alone; repeats are served by _parse_gradient_config and _apply_gradient.
+    parse_tool.cache_function = _skip_tool_cache
+    modifier_tool.cache_function = _skip_tool_cache
+
+    # --- Agents ---
+    #Agent 1: this agent uses parse_gradient_details_tool for extracting gradient details from user prompts and pass it to the SVG modifier
+    gradient_parser = Agent(
+        role="Gradient Parser",
+        goal="Extract gradient details from user prompt",
+        backstory="You are an expert at analyzing design prompts and extracting gradient specifications.",
+        llm=llm,
+        tools=[parse_tool],
+        verbose=verbose,
+        allow_delegation=False,
+    )
+    #Agent 2: this agent uses svg_modifier_tool for applying the gradient to the SVG and updating the fill attributes.
+    svg_modifier = Agent(
+        role="SVG Modifier", 
+        goal="Apply gradient to SVG elements",
+        backstory="You are an SVG expert who specializes in adding gradients to SVG elements.",
+        llm=llm,
+        tools=[modifier_tool],
+        verbose=verbose,
+        allow_delegation=False,
+    )
+
+    # --- Tasks ---
+    # Task 1: Parse gradient details from user prompt 
+    task_parse = Task(
+        description="""
+        Use the parse_gradient_details_tool to identify:
+        - Gradient type (linear or radial)
+        - Direction (horizontal or vertical) 
+        - Start and end colors
+        - Target shape to modify
+
+        Return the parsed configuration.
+
+        Analyze this user prompt and extract gradient details: {user_prompt}
+        """,
+        agent=gradient_parser,
+        expected_output="Gradient configuration details",
+    )
+    # Task 2: Modify SVG with gradient and gets updated SVG 
+    task_modify = Task(
+        description=f"""
+        Modify the SVG to apply the gradient that was parsed in the previous task.
+
+        Use the svg_modifier_tool to apply the gradient configuration to the SVG.
+        The input SVG is already loaded: call the tool with svg_content set to exactly "{CACHED_SVG_SENTINEL}".
+        Return the complete modified SVG with the gradient applied.
+        """,
+        agent=svg_modifier,
+        expected_output="Complete SVG with gradient applied",
+        context=[task_parse],
+    )
+
+    # --- Crew ---
+    # This crew is responsible for handling the gradient application workflow
+    return Crew(
+        agents=[gradient_parser, svg_modifier],
+        tasks=[task_parse, task_modify],
+        process=Process.sequential,
+        verbose=verbose,
+    )
+
+
+# --- Semantic Cache ---
+
+class SemanticCache:
+    """Reuse crew output for prompts whose embedding is close to a cached one on the same SVG."""
+
+    def __init__(self, path, threshold=0.92, model="text-embedding-3-small"):
+        import numpy as np
+        from openai import OpenAI
+
+        self.threshold = threshold
+        self.model = model
+        self.client = OpenAI(api_key=_get_api_key())
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (svg_hash TEXT, embedding BLOB, final_svg TEXT)"
+        )
+        # svg_hash -> (matrix of unit-length prompt embeddings, matching final SVGs)
+        self.entries = {}
+        self.embeddings = {}
+        for svg_hash, embedding, final_svg in self.conn.execute("SELECT * FROM entries"):
+            self._add(svg_hash, np.frombuffer(embedding, dtype=np.float32), final_svg)
+
+    def get(self, prompt, svg_content):
+        entry = self.entries.get(self._hash(svg_content))
+        if entry is None:
+            return None
+
+        matrix, svgs = entry
+        scores = matrix @ self._embed(prompt)
+        best = int(scores.argmax())
+        return svgs[best] if scores[best] >= self.threshold else None
+
+    def put(self, prompt, svg_content, final_svg):
+        svg_hash = self._hash(svg_content)
+        embedding = self._embed(prompt)
+        self.conn.execute(
+            "INSERT INTO entries VALUES (?, ?, ?)", (svg_hash, embedding.tobytes(), final_svg)
+        )
+        self.conn.commit()
+        self._add(svg_hash, embedding, final_svg)
+
+    def _embed(self, prompt):
+        if prompt not in self.embeddings:
+            import numpy as np
+
+            response = self.client.embeddings.create(model=self.model, input=prompt)
+            embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+            self.embeddings[prompt] = embedding / np.linalg.norm(embedding)
+        return self.embeddings[prompt]
+
+    def _add(self, svg_hash, embedding, final_svg):
+        import numpy as np
+
+        matrix, svgs = self.entries.get(svg_hash, (np.empty((0, embedding.size), np.float32), []))
+        self.entries[svg_hash] = (np.vstack([matrix, embedding]), svgs + [final_svg])
+
+    @staticmethod
+    def _hash(svg_content):
+        return hashlib.sha256(svg_content.encode("utf-8")).hexdigest()
+
+
+# One cache per thread: sqlite3 connections can't be shared across threads, and
+# loading the table once per thread avoids re-reading it on every run
+_semantic_caches = threading.local()
+
+# Stored in place of a cache that couldn't be built, so each thread only tries once
+_CACHE_UNAVAILABLE = object()
+
+
+def _semantic_cache():
+    """Return this thread's SemanticCache, creating it on first use; None if unavailable."""
+    cache = getattr(_semantic_caches, "cache", None)
+    if cache is None:
+        try:
+            cache = SemanticCache(SEMANTIC_CACHE_PATH)
+        except Exception:
+            log.warning("⚠️ Semantic cache unavailable; running without it", exc_info=True)
+            cache = _CACHE_UNAVAILABLE
+        _semantic_caches.cache = cache
+    return None if cache is _CACHE_UNAVAILABLE else cache
 
 
 # --- Execution ---
 
-def main():
-    # Create initial SVG
-    initial_svg_content = """<svg width="300" height="300" xmlns="http://www.w3.org/2000/svg">
- <rect x="50" y="50" width="200" height="100" fill="red"/>
-</svg>"""
+def _run_crew(user_prompt, verbose=True):
+    """Kick off the crew on the loaded SVG and return (final_svg, raw_output)."""
+    # The SVG stays out of the prompt; svg_modifier_tool picks it up from workflow_data
+    # Execute crew workflow
+    result = _build_crew(verbose).kickoff(inputs={"user_prompt": user_prompt})
+
+    # For CrewAI 0.165.1, the final output is in result.raw
+    raw_output = result.raw
+    final_svg = None
+
+    # Try to extract SVG from agent response
+    if raw_output:
+        # Look for SVG content in the response
+        start = raw_output.find("<svg")
+        end = raw_output.rfind("</svg>")
+        if start != -1 and end > start:
+            final_svg = raw_output[start:end + len("</svg>")]
+            log.info("✅ Extracted SVG from agent response")
+        else:
+            # Fallback to backup storage
+            final_svg = _wf().get('final_svg')
+            if final_svg:
+                log.info("✅ Using backup SVG from workflow_data")
 
-    write_svg_file(INPUT_SVG_PATH, initial_svg_content)
+    return final_svg, raw_output
 
-    user_prompt = "Change the red rectangle to have a vertical gradient from #ff0000 to #0000ff."
 
-    print("\n" + "=" * 50)
-    print(f"User Prompt: {user_prompt}")
-    print("=" * 50 + "\n")
+def process_svg(svg_content, user_prompt, verbose=True):
+    """Apply the prompt's gradient to svg_content and return (final_svg, raw_output)."""
+    # Start each run with fresh workflow data; threads from run_batch inherit a copy
+    # of the caller's context, which would otherwise share one dict
+    _WF.set({})
 
-    try:
-        # Execute crew workflow
-        result = crew.kickoff(inputs={
-            "user_prompt": user_prompt, 
-            "svg_content": initial_svg_content
-        })
-
-        # For CrewAI 0.165.1, the final output is in result.raw
-        raw_output = result.raw
-        
-        # Extract clean SVG from the output (in case agent adds extra text)
-        final_svg = None
-        
-        # Try to extract SVG from agent response
-        if raw_output:
-            # Look for SVG content in the response
-            svg_match = re.search(r'(<svg[^>]*>.*?</svg>)', raw_output, re.DOTALL)
-            if svg_match:
-                final_svg = svg_match.group(1)
-                print("✅ Extracted SVG from agent response")
-            else:
-                # Fallback to backup storage
-                final_svg = workflow_data.get('final_svg')
-                if final_svg:
-                    print("✅ Using backup SVG from workflow_data")
-        
+    # The tools read the input SVG from here rather than from the prompt
+    _wf()['svg_text'] = svg_content
+
+    # Deterministic prompts don't need the agents
+    final_svg = _fast_path(user_prompt)
+    raw_output = None
+
+    if final_svg:
+        log.info("✅ Applied gradient directly from the parsed prompt")
+    else:
+        # The cache is an optimization; if it fails, the crew can still answer
+        cache = _semantic_cache()
+        try:
+            final_svg = cache.get(user_prompt, svg_content) if cache else None
+        except Exception:
+            log.warning("⚠️ Semantic cache lookup failed; running the crew", exc_info=True)
+            final_svg = None
+
+        if final_svg:
+            log.info("✅ Using cached SVG from a similar prompt")
+        else:
+            final_svg, raw_output = _run_crew(user_prompt, verbose)
+            if final_svg and "<svg" not in final_svg:
+                log.error("❌ Agent output has no <svg> element; discarding it")
+                final_svg = None
+            if cache and final_svg and final_svg.strip():
+                try:
+                    cache.put(user_prompt, svg_content, final_svg)
+                except Exception:
+                    log.warning("⚠️ Could not store the result in the semantic cache", exc_info=True)
+
+    return final_svg, raw_output
+
+
+async def run_batch(jobs, verbose=True):
+    """Run process_svg for each (svg_content, user_prompt) job concurrently.
+
+    Returns one (final_svg, raw_output) tuple per job, or the exception the job raised.
+    """
+    # Each job runs in its own thread with its own workflow data (see process_svg)
+    # and builds its own crew, since a Crew can't be kicked off concurrently
+    return await asyncio.gather(
+        *(asyncio.to_thread(process_svg, svg_content, user_prompt, verbose) for svg_content, user_prompt in jobs),
+        return_exceptions=True,
+    )
+
+
+DEMO_SVG = """<svg width="300" height="300" xmlns="http://www.w3.org/2000/svg">
+ <rect x="50" y="50" width="200" height="100" fill="red"/>
+</svg>"""
+DEMO_PROMPT = "Change the red rectangle to have a vertical gradient from #ff0000 to #0000ff."
+
+# Separator line around the console banners
+_RULE = "=" * 50
+
+
+def main(jobs=None, quiet=False, verbose=False):
+    """Run (input_path, user_prompt, output_path) jobs concurrently; defaults to a demo job."""
+    # Configure only this script's logger; the root logger and third-party loggers
+    # (httpx, openai, ...) keep their defaults, so their INFO records stay hidden
+    if not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+        log.propagate = False
+    log.setLevel(logging.DEBUG if verbose else logging.WARNING if quiet else logging.INFO)
+
+    if not jobs:
+        # Create initial SVG
+        write_svg_file(INPUT_SVG_PATH, DEMO_SVG)
+        jobs = [(INPUT_SVG_PATH, DEMO_PROMPT, OUTPUT_SVG_PATH)]
+
+    loaded = []
+    for input_path, user_prompt, output_path in jobs:
+        svg_content = read_svg_file(input_path)
+        if svg_content is not None:
+            loaded.append((svg_content, user_prompt, output_path))
+
+    for _, user_prompt, _ in loaded:
+        log.info("\n%s", _RULE)
+        log.info("User Prompt: %s", user_prompt)
+        log.info("%s\n", _RULE)
+
+    # CrewAI's step-by-step output is silenced along with INFO logging by --quiet
+    batch = [(svg_content, user_prompt) for svg_content, user_prompt, _ in loaded]
+    results = asyncio.run(run_batch(batch, verbose=not quiet))
+
+    for (_, user_prompt, output_path), result in zip(loaded, results):
+        if isinstance(result, Exception):
+            log.error("❌ Error executing crew for %r: %s", user_prompt, result, exc_info=result)
+            continue
+
+        final_svg, raw_output = result
         if final_svg and final_svg.strip():
-            write_svg_file(OUTPUT_SVG_PATH, final_svg)
-            
-            print("\n" + "=" * 50)
-            print("Workflow Complete!")
-            print("=" * 50 + "\n")
-            print("Modified SVG:")
-            print(final_svg)
+            write_svg_file(output_path, final_svg)
+
+            log.info("\n%s", _RULE)
+            log.info("Workflow Complete!")
+            log.info("%s\n", _RULE)
+            log.info("Modified SVG:")
+            log.info("%s", final_svg)
         else:
-            print("❌ No valid SVG content found")
-            print(f"Raw agent output: {raw_output}")
-            
-    except Exception as e:
-        print(f"❌ Error executing crew: {e}")
-        import traceback
-        traceback.print_exc()
+            log.error("❌ No valid SVG content found for %r", user_prompt)
+            log.error("Raw agent output: %s", raw_output)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Apply a gradient to an SVG from a prompt.")
+    parser.add_argument(
+        "--job",
+        nargs=3,
+        action="append",
+        metavar=("INPUT", "PROMPT", "OUTPUT"),
+        help="SVG file, prompt and output file; repeat to process several SVGs concurrently "
+             "(default: a built-in demo writing input.svg and output.svg)",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--quiet", action="store_true", help="only log warnings and errors")
+    verbosity.add_argument("--verbose", action="store_true", help="also log the parsed config and tool actions")
+    args = parser.parse_args()
+    main(jobs=args.job, quiet=args.quiet, verbose=args.verbose)
\ No newline at end of file